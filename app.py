@@ -3,11 +3,17 @@ Flask web backend for Image Caption Encryption and Metadata Steganography.
 """
 
 import os
-import ast
+import json
+import re
+import uuid
+from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Tuple
 
 from flask import Flask, render_template, request, redirect, url_for, send_from_directory, flash
+from streaming_form_data import StreamingFormDataParser
+from streaming_form_data.parser import ParseFailedException
+from streaming_form_data.targets import FileTarget, ValueTarget
 
 from src.caption_generator import CaptionGenerator
 from src.cipher_engine import CipherEngine
@@ -17,12 +23,19 @@ from src.preview_module import PreviewModule
 BASE_DIR = Path(__file__).resolve().parent
 UPLOAD_FOLDER = BASE_DIR / "uploads"
 OUTPUT_FOLDER = BASE_DIR / "outputs"
+UPLOAD_CHUNK_SIZE = 64 * 1024
+FORM_FIELDS = ("labels", "hill_key", "vigenere_key", "output_name")
+ALLOWED_EXTENSIONS = frozenset({".jpg", ".jpeg"})
+NON_LETTERS = re.compile(r"[^A-Z]+")
 
 app = Flask(__name__)
 app.config["SECRET_KEY"] = "change-me-in-production"
 app.config["UPLOAD_FOLDER"] = str(UPLOAD_FOLDER)
 app.config["OUTPUT_FOLDER"] = str(OUTPUT_FOLDER)
 app.config["MAX_CONTENT_LENGTH"] = 16 * 1024 * 1024  # 16 MB
+# Let a front-end server that honours X-Sendfile (e.g. Apache mod_xsendfile, lighttpd)
+# send downloads itself. nginx only supports X-Accel-Redirect, so leave this off there.
+app.config["USE_X_SENDFILE"] = os.environ.get("USE_X_SENDFILE") == "1"
 
 # Ensure folders exist
 UPLOAD_FOLDER.mkdir(parents=True, exist_ok=True)
@@ -31,20 +44,55 @@ OUTPUT_FOLDER.mkdir(parents=True, exist_ok=True)
 caption_generator = CaptionGenerator()
 
 
+def stream_upload(image_path: Path) -> Tuple[FileTarget, Dict[str, str]]:
+    """
+    Stream the multipart request body, writing the image part straight to disk.
+
+    Text fields that are not valid UTF-8 raise UnicodeDecodeError. Note that
+    streaming-form-data misparses an empty part written without the CRLF
+    before its closing delimiter (allowed by RFC 2046, and what Werkzeug's test
+    client sends for empty fields): the following parts run into that field.
+    Browsers always send the CRLF, so tests posting to /process must give
+    every text field a non-empty value.
+    """
+    parser = StreamingFormDataParser(headers=request.headers)
+    image = FileTarget(str(image_path))
+    fields = {name: ValueTarget() for name in FORM_FIELDS}
+    parser.register("image", image)
+    for name, target in fields.items():
+        parser.register(name, target)
+
+    while True:
+        chunk = request.stream.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        parser.data_received(chunk)
+
+    return image, {name: target.value.decode("utf-8") for name, target in fields.items()}
+
+
 def parse_hill_key(key_str: str) -> List[List[int]]:
     """Safely parse Hill cipher key string into a matrix."""
     try:
-        key = ast.literal_eval(key_str)
-        if not isinstance(key, list) or not all(isinstance(row, list) for row in key):
+        key = json.loads(key_str)
+        if not isinstance(key, list) or not all(
+            isinstance(row, list) and all(type(x) is int for x in row) for row in key
+        ):
             raise ValueError
         return key
     except Exception as exc:  # noqa: BLE001
         raise ValueError("Invalid Hill cipher key format. Use [[a, b], [c, d]]") from exc
 
 
+@lru_cache(maxsize=64)
+def get_cipher_engine(hill_key: Tuple[Tuple[int, ...], ...], vigenere_key: str) -> CipherEngine:
+    """Return a cipher engine for the given keys, reusing one built earlier."""
+    return CipherEngine([list(row) for row in hill_key], vigenere_key)
+
+
 def normalize_text(text: str) -> str:
     """Normalize text for comparison: keep letters, uppercase them."""
-    return "".join(c.upper() for c in text if c.isalpha())
+    return NON_LETTERS.sub("", text.upper())
 
 
 @app.route("/")
@@ -56,32 +104,42 @@ def index():
 @app.route("/process", methods=["POST"])
 def process():
     """Handle form submission: encrypt caption and write to metadata."""
-    if "image" not in request.files:
-        flash("No image file part in request", "error")
-        return redirect(url_for("index"))
-
-    file = request.files["image"]
-    if not file or file.filename == "":
-        flash("No image file selected", "error")
-        return redirect(url_for("index"))
-
-    # Save uploaded image
-    filename = file.filename
-
-    # Basic format validation: this implementation only supports EXIF comments on JPEG images.
-    allowed_extensions = {".jpg", ".jpeg", ".JPG", ".JPEG"}
-    _, ext = os.path.splitext(filename)
-    if ext not in allowed_extensions:
-        flash("Only JPEG images (.jpg, .jpeg) are supported for metadata encryption.", "error")
-        return redirect(url_for("index"))
-    upload_path = UPLOAD_FOLDER / filename
-    file.save(upload_path)
+    # Stream uploaded image to a temporary file while parsing the form
+    temp_path = UPLOAD_FOLDER / f".upload-{uuid.uuid4().hex}"
+    try:
+        # Werkzeug errors such as RequestEntityTooLarge (413) propagate unchanged
+        try:
+            image, form = stream_upload(temp_path)
+        except UnicodeDecodeError:
+            flash("Form fields must be valid UTF-8 text", "error")
+            return redirect(url_for("index"))
+        except (ParseFailedException, ValueError):
+            flash("No image file part in request", "error")
+            return redirect(url_for("index"))
+
+        filename = image.multipart_filename
+        if filename is None:
+            flash("No image file part in request", "error")
+            return redirect(url_for("index"))
+        if filename == "":
+            flash("No image file selected", "error")
+            return redirect(url_for("index"))
+
+        # Basic format validation: this implementation only supports EXIF comments on JPEG images.
+        if Path(filename).suffix.lower() not in ALLOWED_EXTENSIONS:
+            flash("Only JPEG images (.jpg, .jpeg) are supported for metadata encryption.", "error")
+            return redirect(url_for("index"))
+        upload_path = UPLOAD_FOLDER / filename
+        os.replace(temp_path, upload_path)
+    finally:
+        # Rejected uploads leave no partial file behind; accepted ones were already moved
+        temp_path.unlink(missing_ok=True)
 
     # Read form fields
-    labels_str = request.form.get("labels", "")
-    hill_key_str = request.form.get("hill_key", "")
-    vigenere_key = request.form.get("vigenere_key", "")
-    output_name = request.form.get("output_name", "encrypted_" + filename)
+    labels_str = form["labels"]
+    hill_key_str = form["hill_key"]
+    vigenere_key = form["vigenere_key"]
+    output_name = form["output_name"] or "encrypted_" + filename
 
     # Validate keys
     if not hill_key_str or not vigenere_key:
@@ -90,7 +148,7 @@ def process():
 
     try:
         hill_key = parse_hill_key(hill_key_str)
-        cipher_engine = CipherEngine(hill_key, vigenere_key)
+        cipher_engine = get_cipher_engine(tuple(map(tuple, hill_key)), vigenere_key)
     except Exception as exc:  # noqa: BLE001
         flash(str(exc), "error")
         return redirect(url_for("index"))
@@ -104,18 +162,21 @@ def process():
 
     # Write to metadata
     output_path = OUTPUT_FOLDER / output_name
-    handler = MetadataHandler(str(upload_path))
-    success = handler.write_comment(encrypted_caption, str(output_path))
-    handler.close()
+    with MetadataHandler(str(upload_path)) as handler:
+        success = handler.write_comment(encrypted_caption, str(output_path))
 
     if not success:
         flash("Failed to write encrypted caption to image metadata", "error")
         return redirect(url_for("index"))
 
-    # Read back and decrypt for verification
-    verify_handler = MetadataHandler(str(output_path))
-    encrypted_from_meta = verify_handler.read_comment()
-    verify_handler.close()
+    # Decrypt for verification; the comment just written is encrypted_caption,
+    # so the output image is only reopened when a full round-trip is requested.
+    verified_from_file = request.args.get("verify") == "full"
+    if verified_from_file:
+        with MetadataHandler(str(output_path)) as verify_handler:
+            encrypted_from_meta = verify_handler.read_comment()
+    else:
+        encrypted_from_meta = encrypted_caption
 
     decrypted_caption = (
         cipher_engine.decrypt(encrypted_from_meta) if encrypted_from_meta else "(No comment found)"
@@ -135,6 +196,7 @@ def process():
         caption=caption,
         encrypted_caption=encrypted_caption,
         encrypted_from_meta=encrypted_from_meta,
+        verified_from_file=verified_from_file,
         decrypted_caption=decrypted_caption,
         comparison=comparison,
         is_match=is_match,
@@ -144,7 +206,19 @@ def process():
 @app.route("/download/<path:filename>")
 def download_file(filename: str):  # noqa: D401
     """Download modified image file."""
-    return send_from_directory(app.config["OUTPUT_FOLDER"], filename, as_attachment=True)
+    # Output names are reused between runs, so clients must revalidate; an
+    # unchanged file is answered with 304 Not Modified via its ETag.
+    response = send_from_directory(
+        app.config["OUTPUT_FOLDER"],
+        filename,
+        as_attachment=True,
+        download_name=Path(filename).name,
+        conditional=True,
+        etag=True,
+        max_age=0,
+    )
+    response.cache_control.public = True
+    return response
 
 
 if __name__ == "__main__":
@@ -3,33 +3,65 @@ Caption Generator Module
 Generates captions from labels and learns from user input over time.
 """
 
+import atexit
+import bisect
 import json
 import os
-from typing import List, Set
+import threading
+import weakref
+from typing import List, Optional, Set
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the json module
+    orjson = None
+
+# Generators that may hold unsaved labels, flushed once at interpreter exit
+_generators: "weakref.WeakSet[CaptionGenerator]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all():
+    """Save the dictionaries of all live generators before the interpreter exits."""
+    for generator in list(_generators):
+        generator.flush()
+
 
 class CaptionGenerator:
     """Generates captions from labels with learning capability."""
     
-    def __init__(self, dictionary_file: str = "data/caption_dictionary.json"):
+    def __init__(self, dictionary_file: str = "data/caption_dictionary.json",
+                 flush_interval: float = 5.0):
         """
         Initialize caption generator.
         
         Args:
             dictionary_file: Path to JSON file storing learned labels
+            flush_interval: Seconds after the first unsaved label before it is saved
         """
         self.dictionary_file = dictionary_file
         self.dictionary: Set[str] = set()
         self._load_dictionary()
+        
+        # Sorted view of the dictionary for prefix lookups
+        self._sorted: List[str] = sorted(self.dictionary)
+        
+        # New labels are written to disk in the background, not per request
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._flush_interval = flush_interval
+        self._timer: Optional[threading.Timer] = None
+        _generators.add(self)
     
     def _load_dictionary(self):
         """Load dictionary from file if it exists."""
         if os.path.exists(self.dictionary_file):
             try:
-                with open(self.dictionary_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.dictionary = set(data.get('labels', []))
+                with open(self.dictionary_file, 'rb') as f:
+                    raw = f.read()
+                data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+                self.dictionary = set(data.get('labels', []))
             except (json.JSONDecodeError, IOError):
                 self.dictionary = set()
         else:
@@ -40,8 +72,24 @@ class CaptionGenerator:
     def _save_dictionary(self):
         """Save dictionary to file."""
         os.makedirs(os.path.dirname(self.dictionary_file), exist_ok=True)
-        with open(self.dictionary_file, 'w', encoding='utf-8') as f:
-            json.dump({'labels': sorted(list(self.dictionary))}, f, indent=2)
+        data = {'labels': self._sorted}
+        if orjson is not None:
+            with open(self.dictionary_file, 'wb') as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(self.dictionary_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+    
+    def flush(self):
+        """Save the dictionary to file if new labels were added since the last save."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            self._save_dictionary()
+            self._dirty = False
     
     def add_labels(self, labels: List[str]):
         """
@@ -50,10 +98,19 @@ class CaptionGenerator:
         Args:
             labels: List of label strings to add
         """
-        for label in labels:
-            if label.strip():
-                self.dictionary.add(label.strip().lower())
-        self._save_dictionary()
+        with self._lock:
+            for label in labels:
+                label = label.strip().lower()
+                if label and label not in self.dictionary:
+                    self.dictionary.add(label)
+                    bisect.insort(self._sorted, label)
+                    self._dirty = True
+            
+            # Schedule one save for the labels added until it runs
+            if self._dirty and self._timer is None:
+                self._timer = threading.Timer(self._flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
     
     def generate_caption(self, labels: List[str]) -> str:
         """
@@ -97,9 +154,8 @@ class CaptionGenerator:
         Returns:
             List of suggested labels
         """
-        suggestions = sorted(list(self.dictionary))
-        if prefix:
-            prefix_lower = prefix.lower()
-            suggestions = [s for s in suggestions if s.startswith(prefix_lower)]
-        return suggestions[:10]  # Return top 10 suggestions
+        prefix_lower = prefix.lower()
+        lo = bisect.bisect_left(self._sorted, prefix_lower)
+        hi = bisect.bisect_right(self._sorted, prefix_lower + '\uffff', lo)
+        return self._sorted[lo:min(hi, lo + 10)]  # Return top 10 suggestions
 
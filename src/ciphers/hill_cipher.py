@@ -3,9 +3,14 @@ Hill Cipher Implementation
 A classical cipher that uses matrix multiplication for encryption/decryption.
 """
 
+import math
+import re
 import numpy as np
 from typing import List, Tuple
 
+# Everything outside the cipher alphabet (applied after upper-casing)
+_NON_LETTERS = re.compile(r'[^A-Z]+')
+
 
 class HillCipher:
     """Hill Cipher implementation using matrix multiplication."""
@@ -17,59 +22,68 @@ class HillCipher:
         Args:
             key_matrix: 2x2 or 3x3 matrix of integers (mod 26)
         """
-        self.key_matrix = np.array(key_matrix, dtype=int)
+        matrix = np.array(key_matrix, dtype=int)
         self.n = len(key_matrix)
         
         # Validate key matrix
-        if self.n not in [2, 3]:
+        if self.n not in [2, 3] or matrix.shape != (self.n, self.n):
             raise ValueError("Key matrix must be 2x2 or 3x3")
         
+        # Entries live in [0, 25], so uint8 is enough
+        self.key_matrix = (matrix % 26).astype(np.uint8)
+        
         # Check if key matrix is invertible (mod 26)
-        det = int(np.round(np.linalg.det(self.key_matrix))) % 26
-        if det == 0 or np.gcd(det, 26) != 1:
+        det = self._determinant(self.key_matrix) % 26
+        if det == 0 or math.gcd(det, 26) != 1:
             raise ValueError("Key matrix must be invertible modulo 26")
         
         # Calculate inverse matrix
         self.inverse_key = self._mod_inverse_matrix(self.key_matrix)
     
+    def _determinant(self, matrix: np.ndarray) -> int:
+        """Calculate the integer determinant of the key matrix."""
+        if self.n == 2:
+            a, b, c, d = (int(x) for x in matrix.flat)
+            return a * d - b * c
+        return int(np.round(np.linalg.det(matrix)))
+    
     def _mod_inverse_matrix(self, matrix: np.ndarray) -> np.ndarray:
         """Calculate the modular inverse of the key matrix."""
-        det = int(np.round(np.linalg.det(matrix))) % 26
+        det = self._determinant(matrix) % 26
         
         # Find modular inverse of determinant
         det_inv = self._mod_inverse(det, 26)
         
         # Calculate adjugate matrix
         if self.n == 2:
-            adj = np.array([[matrix[1, 1], -matrix[0, 1]],
-                           [-matrix[1, 0], matrix[0, 0]]])
+            # Plain integer adjugate, no LAPACK call needed
+            a, b, c, d = (int(x) for x in matrix.flat)
+            adj = np.array([[d, -b], [-c, a]])
         else:  # n == 3
             adj = np.round(np.linalg.inv(matrix) * np.linalg.det(matrix))
         
         # Multiply by determinant inverse and mod 26
         inverse = (det_inv * adj) % 26
-        return inverse.astype(int)
+        return inverse.astype(np.uint8)
     
     def _mod_inverse(self, a: int, m: int) -> int:
         """Calculate modular inverse using extended Euclidean algorithm."""
-        a = a % m
-        for x in range(1, m):
-            if (a * x) % m == 1:
-                return x
-        raise ValueError("Modular inverse does not exist")
+        try:
+            return pow(a % m, -1, m)
+        except ValueError:
+            raise ValueError("Modular inverse does not exist") from None
     
-    def _text_to_numbers(self, text: str) -> List[int]:
-        """Convert text to numbers (A=0, B=1, ..., Z=25)."""
-        return [ord(c.upper()) - ord('A') for c in text if c.isalpha()]
-    
-    def _numbers_to_text(self, numbers: List[int]) -> str:
-        """Convert numbers to text."""
-        return ''.join(chr(n + ord('A')) for n in numbers)
+    def _apply_matrix(self, matrix: np.ndarray, numbers: np.ndarray) -> np.ndarray:
+        """Multiply every n-letter block by matrix (mod 26) in a single matmul."""
+        # Products stay below 25 * 25 * 3 = 1875, which fits in uint16
+        blocks = numbers.reshape(-1, self.n).T.astype(np.uint16)
+        product = matrix.astype(np.uint16) @ blocks
+        return (product % 26).astype(np.uint8).T.reshape(-1)
     
     def _pad_text(self, text: str) -> str:
         """Pad text to be multiple of n."""
         # Remove non-alphabetic characters and convert to uppercase
-        text = ''.join(c.upper() for c in text if c.isalpha())
+        text = _NON_LETTERS.sub('', text.upper())
         
         # Pad with 'X' if necessary
         remainder = len(text) % self.n
@@ -90,16 +104,11 @@ class HillCipher:
         """
         # Pad and convert to numbers
         padded_text = self._pad_text(plaintext)
-        numbers = self._text_to_numbers(padded_text)
-        
-        # Encrypt in blocks
-        ciphertext_numbers = []
-        for i in range(0, len(numbers), self.n):
-            block = np.array(numbers[i:i+self.n])
-            encrypted_block = (self.key_matrix @ block) % 26
-            ciphertext_numbers.extend(encrypted_block.tolist())
+        numbers = np.frombuffer(padded_text.encode('ascii'), dtype=np.uint8) - ord('A')
         
-        return self._numbers_to_text(ciphertext_numbers)
+        # Encrypt all blocks at once: one column per block
+        encrypted = self._apply_matrix(self.key_matrix, numbers) + ord('A')
+        return encrypted.tobytes().decode('ascii')
     
     def decrypt(self, ciphertext: str) -> str:
         """
@@ -112,14 +121,10 @@ class HillCipher:
             Decrypted plaintext
         """
         # Convert to numbers
-        numbers = self._text_to_numbers(ciphertext)
-        
-        # Decrypt in blocks
-        plaintext_numbers = []
-        for i in range(0, len(numbers), self.n):
-            block = np.array(numbers[i:i+self.n])
-            decrypted_block = (self.inverse_key @ block) % 26
-            plaintext_numbers.extend(decrypted_block.tolist())
+        text = _NON_LETTERS.sub('', ciphertext.upper())
+        numbers = np.frombuffer(text.encode('ascii'), dtype=np.uint8) - ord('A')
         
-        return self._numbers_to_text(plaintext_numbers)
+        # Decrypt all blocks at once: one column per block
+        decrypted = self._apply_matrix(self.inverse_key, numbers) + ord('A')
+        return decrypted.tobytes().decode('ascii')
 
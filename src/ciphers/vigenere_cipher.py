@@ -3,7 +3,54 @@ Vigenère Cipher Implementation
 A classical polyalphabetic substitution cipher.
 """
 
-from typing import List
+import re
+import numpy as np
+from functools import lru_cache
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; fall back to NumPy indexing
+    njit = None
+
+_NON_LETTERS = re.compile(r'[^A-Z]+')
+
+
+if njit is not None:
+    @njit(cache=True, nogil=True)
+    def _substitute_kernel(numbers, table, out):
+        """Look up each letter in the table row of its key position."""
+        key_length = table.shape[0]
+        k = 0
+        for i in range(numbers.shape[0]):
+            out[i] = table[k, numbers[i]]
+            # Wrap the key position without a per-letter modulo
+            k += 1
+            if k == key_length:
+                k = 0
+else:
+    _substitute_kernel = None
+
+
+# Longest bucket kept in the cache; at most 32 buckets of 128 KiB each, so
+# very long captions or many distinct keys cannot grow the cache unbounded
+_MAX_CACHED_BUCKET = 64 * 1024
+
+
+@lru_cache(maxsize=32)
+def _bucket_positions(bucket: int, key_length: int) -> np.ndarray:
+    """Key index used for each position of a text of length bucket."""
+    # Positions are below bucket, so they fit in uint16 while bucket <= 64 Ki
+    positions = (np.arange(bucket) % key_length).astype(np.uint16)
+    positions.flags.writeable = False
+    return positions
+
+
+def _key_positions(length: int, key_length: int) -> np.ndarray:
+    """Key index for each position, sliced from a cached power-of-two bucket."""
+    bucket = max(64, 1 << (length - 1).bit_length())
+    if bucket > _MAX_CACHED_BUCKET:
+        return np.arange(length, dtype=np.intp) % key_length
+    return _bucket_positions(bucket, key_length)[:length]
 
 
 class VigenereCipher:
@@ -22,14 +69,21 @@ class VigenereCipher:
         
         # Convert key to numbers
         self.key_numbers = [ord(c) - ord('A') for c in self.key]
+        self._key_np = (np.array(self.key_numbers) % 26).astype(np.uint8)
+        
+        # Lookup tables indexed by [key position, letter number] giving ASCII output letters
+        letters = np.arange(26)
+        self._enc_table = ((letters[None, :] + self._key_np[:, None]) % 26 + ord('A')).astype(np.uint8)
+        self._dec_table = ((letters[None, :] - self._key_np[:, None]) % 26 + ord('A')).astype(np.uint8)
     
-    def _text_to_numbers(self, text: str) -> List[int]:
-        """Convert text to numbers (A=0, B=1, ..., Z=25)."""
-        return [ord(c.upper()) - ord('A') for c in text if c.isalpha()]
-    
-    def _numbers_to_text(self, numbers: List[int]) -> str:
-        """Convert numbers to text."""
-        return ''.join(chr(n + ord('A')) for n in numbers)
+    def _substitute(self, table: np.ndarray, numbers: np.ndarray) -> str:
+        """Apply a lookup table to letter numbers using the repeating key."""
+        if _substitute_kernel is not None:
+            out = np.empty_like(numbers)
+            _substitute_kernel(numbers, table, out)
+        else:
+            out = table[_key_positions(len(numbers), len(self.key_numbers)), numbers]
+        return out.tobytes().decode('ascii')
     
     def encrypt(self, plaintext: str) -> str:
         """
@@ -41,18 +95,11 @@ class VigenereCipher:
         Returns:
             Encrypted ciphertext
         """
-        # Convert to uppercase and filter alphabetic characters
-        text = ''.join(c.upper() for c in plaintext if c.isalpha())
-        text_numbers = self._text_to_numbers(text)
+        text = _NON_LETTERS.sub('', plaintext.upper())
+        numbers = np.frombuffer(text.encode('ascii'), dtype=np.uint8) - ord('A')
         
-        # Encrypt using key
-        ciphertext_numbers = []
-        for i, char_num in enumerate(text_numbers):
-            key_index = i % len(self.key_numbers)
-            encrypted_num = (char_num + self.key_numbers[key_index]) % 26
-            ciphertext_numbers.append(encrypted_num)
-        
-        return self._numbers_to_text(ciphertext_numbers)
+        # Encrypt using key repeated over the whole text
+        return self._substitute(self._enc_table, numbers)
     
     def decrypt(self, ciphertext: str) -> str:
         """
@@ -64,16 +111,8 @@ class VigenereCipher:
         Returns:
             Decrypted plaintext
         """
-        # Convert to uppercase and filter alphabetic characters
-        text = ''.join(c.upper() for c in ciphertext if c.isalpha())
-        text_numbers = self._text_to_numbers(text)
-        
-        # Decrypt using key
-        plaintext_numbers = []
-        for i, char_num in enumerate(text_numbers):
-            key_index = i % len(self.key_numbers)
-            decrypted_num = (char_num - self.key_numbers[key_index]) % 26
-            plaintext_numbers.append(decrypted_num)
+        text = _NON_LETTERS.sub('', ciphertext.upper())
+        numbers = np.frombuffer(text.encode('ascii'), dtype=np.uint8) - ord('A')
         
-        return self._numbers_to_text(plaintext_numbers)
-
+        # Decrypt using key repeated over the whole text
+        return self._substitute(self._dec_table, numbers)
@@ -7,7 +7,10 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 import os
 import ast
-from typing import Optional, List
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Optional, List
 from pathlib import Path
 
 from .caption_generator import CaptionGenerator
@@ -15,6 +18,26 @@ from .cipher_engine import CipherEngine
 from .metadata_handler import MetadataHandler
 from .preview_module import PreviewModule
 
+# Worker thread for file I/O and encryption, keeping the Tk main loop responsive.
+# A single worker runs jobs one at a time, so a save never overlaps a read.
+_executor = ThreadPoolExecutor(max_workers=1)
+
+
+@lru_cache(maxsize=16)
+def _parse_matrix(matrix_str: str) -> tuple:
+    """Parse a matrix literal such as "[[3, 3], [2, 5]]" into a tuple of row tuples."""
+    return tuple(tuple(row) for row in ast.literal_eval(matrix_str))
+
+
+def _set_text(widget: tk.Text, content: str):
+    """Replace the whole content of a text widget with a single Tk call."""
+    disabled = str(widget.cget('state')) == tk.DISABLED
+    if disabled:
+        widget.configure(state=tk.NORMAL)
+    widget.replace(1.0, tk.END, content)
+    if disabled:
+        widget.configure(state=tk.DISABLED)
+
 
 class SteganographyGUI:
     """Main GUI application for image caption encryption and metadata steganography."""
@@ -34,9 +57,35 @@ class SteganographyGUI:
         self.caption_generator = CaptionGenerator()
         self.cipher_engine: Optional[CipherEngine] = None
         self.selected_image_path: Optional[str] = None
+        self._selected_dir: Optional[str] = None
+        
+        # Last generated caption, reused while the labels are unchanged
+        self._last_labels_str: Optional[str] = None
+        self._last_caption: Optional[str] = None
+        
+        # Background job in progress, if any
+        self._job: Optional[Future] = None
         
         # Create GUI elements
         self._create_widgets()
+        
+        # Run the cipher pipeline once in the background so the first click
+        # does not pay one-time costs such as Numba compilation. It gets its
+        # own thread so it never holds up the file job executor.
+        threading.Thread(
+            target=self._warm_up,
+            args=(self.hill_key_entry.get(), self.vigenere_key_entry.get()),
+            daemon=True,
+        ).start()
+    
+    def _warm_up(self, hill_key_str: str, vigenere_key: str):
+        """Encrypt and decrypt a sample text with the default keys, discarding the result."""
+        try:
+            hill_key = [list(row) for row in _parse_matrix(hill_key_str)]
+            cipher_engine = CipherEngine(hill_key, vigenere_key)
+            cipher_engine.decrypt(cipher_engine.encrypt("warm up"))
+        except Exception:
+            pass
     
     def _create_widgets(self):
         """Create and arrange GUI widgets."""
@@ -133,16 +182,18 @@ class SteganographyGUI:
         self.output_file_entry.grid(row=1, column=1, sticky=(tk.W, tk.E), padx=5, pady=5)
         self.output_file_entry.insert(0, "encrypted_image.jpg")
         
-        ttk.Button(encrypt_frame, text="Encrypt and Save to Metadata", 
-                  command=self._encrypt_and_save).grid(row=2, column=0, columnspan=2, pady=10)
+        self.encrypt_button = ttk.Button(encrypt_frame, text="Encrypt and Save to Metadata", 
+                                         command=self._encrypt_and_save)
+        self.encrypt_button.grid(row=2, column=0, columnspan=2, pady=10)
         
         # Verification section
         verify_frame = ttk.LabelFrame(main_frame, text="Verification", padding="10")
         verify_frame.grid(row=5, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=10)
         verify_frame.columnconfigure(0, weight=1)
         
-        ttk.Button(verify_frame, text="Read and Decrypt from Metadata", 
-                  command=self._verify_decrypt).grid(row=0, column=0, pady=5)
+        self.verify_button = ttk.Button(verify_frame, text="Read and Decrypt from Metadata", 
+                                        command=self._verify_decrypt)
+        self.verify_button.grid(row=0, column=0, pady=5)
         
         self.verification_text = scrolledtext.ScrolledText(verify_frame, height=4, wrap=tk.WORD)
         self.verification_text.grid(row=1, column=0, sticky=(tk.W, tk.E), pady=5)
@@ -152,11 +203,52 @@ class SteganographyGUI:
         preview_frame.grid(row=6, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=10)
         preview_frame.columnconfigure(0, weight=1)
         
-        ttk.Button(preview_frame, text="Compare Original and Modified Files", 
-                  command=self._preview_files).grid(row=0, column=0, pady=5)
+        self.preview_button = ttk.Button(preview_frame, text="Compare Original and Modified Files", 
+                                         command=self._preview_files)
+        self.preview_button.grid(row=0, column=0, pady=5)
         
         self.preview_text = scrolledtext.ScrolledText(preview_frame, height=6, wrap=tk.WORD)
         self.preview_text.grid(row=1, column=0, sticky=(tk.W, tk.E), pady=5)
+        
+        # Buttons that start background jobs, disabled while any job runs
+        self._action_buttons = (self.encrypt_button, self.verify_button, self.preview_button)
+    
+    def _run_in_background(self, work: Callable[[], Any],
+                           on_done: Callable[[Any], None], error_prefix: str):
+        """
+        Run work on the worker thread and pass its result to on_done on the Tk thread.
+        
+        Only one job runs at a time; all action buttons stay disabled until it finishes.
+        
+        Args:
+            work: Function doing the file I/O and encryption (must not touch widgets)
+            on_done: Function updating widgets with the result of work
+            error_prefix: Message shown before the error if work raises
+        """
+        if self._job is not None:
+            return
+        
+        for button in self._action_buttons:
+            button.state(['disabled'])
+        self._job = _executor.submit(work)
+        self.root.after(50, self._poll_background, on_done, error_prefix)
+    
+    def _poll_background(self, on_done: Callable[[Any], None], error_prefix: str):
+        """Wait for background work without blocking the main loop."""
+        future = self._job
+        if not future.done():
+            self.root.after(50, self._poll_background, on_done, error_prefix)
+            return
+        
+        self._job = None
+        for button in self._action_buttons:
+            button.state(['!disabled'])
+        try:
+            result = future.result()
+        except Exception as e:
+            messagebox.showerror("Error", f"{error_prefix}: {str(e)}")
+            return
+        on_done(result)
     
     def _browse_image(self):
         """Browse for an image file."""
@@ -171,27 +263,33 @@ class SteganographyGUI:
         )
         if filename:
             self.selected_image_path = filename
+            self._selected_dir = os.path.dirname(filename)
             self.image_path_var.set(filename)
     
     def _generate_caption(self):
         """Generate caption from labels."""
         labels_str = self.labels_entry.get()
-        labels = [label.strip() for label in labels_str.split(',') if label.strip()]
-        
-        if not labels:
-            messagebox.showwarning("Warning", "Please enter at least one label.")
-            return
+        if labels_str == self._last_labels_str:
+            caption = self._last_caption
+        else:
+            labels = [label.strip() for label in labels_str.split(',') if label.strip()]
+            
+            if not labels:
+                messagebox.showwarning("Warning", "Please enter at least one label.")
+                return
+            
+            caption = self.caption_generator.generate_caption(labels)
+            self._last_labels_str = labels_str
+            self._last_caption = caption
         
-        caption = self.caption_generator.generate_caption(labels)
-        self.caption_text.delete(1.0, tk.END)
-        self.caption_text.insert(1.0, caption)
+        _set_text(self.caption_text, caption)
     
     def _initialize_ciphers(self):
         """Initialize cipher engine with provided keys."""
         try:
             # Parse Hill cipher key
             hill_key_str = self.hill_key_entry.get()
-            hill_key = ast.literal_eval(hill_key_str)
+            hill_key = [list(row) for row in _parse_matrix(hill_key_str)]
             
             # Get Vigenère key
             vigenere_key = self.vigenere_key_entry.get()
@@ -225,24 +323,29 @@ class SteganographyGUI:
             messagebox.showerror("Error", "Please enter an output file name.")
             return
         
-        try:
+        cipher_engine = self.cipher_engine
+        image_path = self.selected_image_path
+        output_path = os.path.join(self._selected_dir, output_filename)
+        
+        def work():
             # Encrypt caption
-            encrypted = self.cipher_engine.encrypt(caption)
-            self.encrypted_text.delete(1.0, tk.END)
-            self.encrypted_text.insert(1.0, encrypted)
+            encrypted = cipher_engine.encrypt(caption)
             
             # Save to metadata
-            handler = MetadataHandler(self.selected_image_path)
-            output_path = os.path.join(os.path.dirname(self.selected_image_path), output_filename)
+            with MetadataHandler(image_path) as handler:
+                saved = handler.write_comment(encrypted, output_path)
+            return encrypted, saved
+        
+        def done(result):
+            encrypted, saved = result
+            _set_text(self.encrypted_text, encrypted)
             
-            if handler.write_comment(encrypted, output_path):
+            if saved:
                 messagebox.showinfo("Success", f"Encrypted caption saved to metadata!\nOutput: {output_path}")
             else:
                 messagebox.showerror("Error", "Failed to save encrypted caption to metadata.")
-            
-            handler.close()
-        except Exception as e:
-            messagebox.showerror("Error", f"Encryption failed: {str(e)}")
+        
+        self._run_in_background(work, done, "Encryption failed")
     
     def _verify_decrypt(self):
         """Read and decrypt caption from metadata."""
@@ -256,33 +359,43 @@ class SteganographyGUI:
             return
         
         try:
-            output_path = os.path.join(os.path.dirname(self.selected_image_path), output_filename)
+            output_path = os.path.join(self._selected_dir, output_filename)
             if not os.path.exists(output_path):
                 messagebox.showerror("Error", f"Output file not found: {output_path}")
                 return
-            
+        except Exception as e:
+            messagebox.showerror("Error", f"Verification failed: {str(e)}")
+            return
+        
+        cipher_engine = self.cipher_engine
+        
+        def work():
             # Read from metadata
-            handler = MetadataHandler(output_path)
-            encrypted_comment = handler.read_comment()
-            handler.close()
+            with MetadataHandler(output_path) as handler:
+                encrypted_comment = handler.read_comment()
             
+            # Decrypt
+            decrypted = cipher_engine.decrypt(encrypted_comment) if encrypted_comment else None
+            return encrypted_comment, decrypted
+        
+        def done(result):
+            encrypted_comment, decrypted = result
             if not encrypted_comment:
                 messagebox.showwarning("Warning", "No encrypted comment found in metadata.")
                 return
             
-            # Decrypt
-            decrypted = self.cipher_engine.decrypt(encrypted_comment)
-            
             # Display results
-            result = f"Encrypted (from metadata): {encrypted_comment}\n\n"
-            result += f"Decrypted: {decrypted}\n\n"
-            result += f"Original caption: {self.caption_text.get(1.0, tk.END).strip()}\n\n"
-            result += f"Match: {'✓ YES' if decrypted == self.caption_text.get(1.0, tk.END).strip() else '✗ NO'}"
+            original = self.caption_text.get(1.0, tk.END).strip()
+            result = "\n\n".join([
+                f"Encrypted (from metadata): {encrypted_comment}",
+                f"Decrypted: {decrypted}",
+                f"Original caption: {original}",
+                f"Match: {'✓ YES' if decrypted == original else '✗ NO'}",
+            ])
             
-            self.verification_text.delete(1.0, tk.END)
-            self.verification_text.insert(1.0, result)
-        except Exception as e:
-            messagebox.showerror("Error", f"Verification failed: {str(e)}")
+            _set_text(self.verification_text, result)
+        
+        self._run_in_background(work, done, "Verification failed")
     
     def _preview_files(self):
         """Preview and compare original and modified files."""
@@ -295,40 +408,35 @@ class SteganographyGUI:
             messagebox.showerror("Error", "Please enter the output file name.")
             return
         
-        try:
-            output_path = os.path.join(os.path.dirname(self.selected_image_path), output_filename)
-            if not os.path.exists(output_path):
-                messagebox.showerror("Error", f"Output file not found: {output_path}")
-                return
-            
-            comparison = PreviewModule.compare_files(self.selected_image_path, output_path)
-            
-            # Format preview text
-            preview_text = "=== ORIGINAL FILE ===\n"
-            if comparison['original']:
-                for key, value in comparison['original'].items():
-                    preview_text += f"{key}: {value}\n"
-            else:
-                preview_text += "Unable to read file properties\n"
-            
-            preview_text += "\n=== MODIFIED FILE ===\n"
-            if comparison['modified']:
-                for key, value in comparison['modified'].items():
-                    preview_text += f"{key}: {value}\n"
-            else:
-                preview_text += "Unable to read file properties\n"
-            
-            preview_text += "\n=== DIFFERENCES ===\n"
-            if comparison['differences']:
-                for key, value in comparison['differences'].items():
-                    preview_text += f"{key}: {value}\n"
-            else:
-                preview_text += "No significant differences detected\n"
+        output_path = os.path.join(self._selected_dir, output_filename)
+        if not os.path.exists(output_path):
+            messagebox.showerror("Error", f"Output file not found: {output_path}")
+            return
+        
+        image_path = self.selected_image_path
+        
+        def work():
+            comparison = PreviewModule.compare_files(image_path, output_path)
             
-            self.preview_text.delete(1.0, tk.END)
-            self.preview_text.insert(1.0, preview_text)
-        except Exception as e:
-            messagebox.showerror("Error", f"Preview failed: {str(e)}")
+            # Format preview text, one line per entry, joined once at the end
+            lines = []
+            for title, properties, empty_message in (
+                ("ORIGINAL FILE", comparison['original'], "Unable to read file properties"),
+                ("MODIFIED FILE", comparison['modified'], "Unable to read file properties"),
+                ("DIFFERENCES", comparison['differences'], "No significant differences detected"),
+            ):
+                lines.append(f"=== {title} ===")
+                if properties:
+                    lines.extend(f"{key}: {value}" for key, value in properties.items())
+                else:
+                    lines.append(empty_message)
+                lines.append("")
+            return "\n".join(lines)
+        
+        def done(preview_text):
+            _set_text(self.preview_text, preview_text)
+        
+        self._run_in_background(work, done, "Preview failed")
 
 
 def main():
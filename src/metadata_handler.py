@@ -3,10 +3,91 @@ Metadata Handler Module
 Handles reading and writing EXIF metadata in image files.
 """
 
-from PIL import Image
+from PIL import Image, UnidentifiedImageError
 from PIL.ExifTags import TAGS
+import io
 import os
-from typing import Optional, Dict
+import shutil
+import struct
+import piexif
+from functools import cached_property
+from typing import BinaryIO, Optional, Dict
+
+# Comment tags in lookup priority order: ImageDescription, UserComment, XPComment
+_COMMENT_TAGS = (270, 37510, 40092)
+
+# PIL format names for the extensions offered by the file dialog
+_EXTENSION_FORMATS = {
+    '.jpg': 'JPEG',
+    '.jpeg': 'JPEG',
+    '.png': 'PNG',
+    '.bmp': 'BMP',
+    '.tiff': 'TIFF',
+    '.tif': 'TIFF',
+}
+
+# JPEG marker codes that have no length field: TEM and RST0-RST7
+_STANDALONE_MARKERS = frozenset({0x01, *range(0xD0, 0xD8)})
+
+
+def open_image(image_path: str) -> Image.Image:
+    """
+    Open an image, trying the format implied by its extension first.
+    
+    Passing formats= lets PIL skip probing (and importing) every plugin. Files
+    with other extensions, or whose content does not match their extension,
+    fall back to full detection.
+    """
+    image_format = _EXTENSION_FORMATS.get(os.path.splitext(image_path)[1].lower())
+    if image_format is not None:
+        try:
+            return Image.open(image_path, formats=[image_format])
+        except UnidentifiedImageError:
+            pass
+    return Image.open(image_path)
+
+
+def _read_jpeg_header(f: BinaryIO) -> bytes:
+    """
+    Read JPEG segments from the start of the file up to the start-of-scan marker.
+    
+    piexif expects every segment to be a two-byte marker followed by a length,
+    so fill bytes before a marker and standalone markers are left out of the
+    returned header. Malformed or truncated headers raise ValueError.
+    """
+    if f.read(2) != b'\xff\xd8':
+        raise ValueError("Not a JPEG file")
+    
+    header = b'\xff\xd8'
+    while True:
+        if f.read(1) != b'\xff':
+            raise ValueError("Invalid JPEG segment marker")
+        
+        # Any number of 0xFF fill bytes may precede the marker code
+        code = f.read(1)
+        while code == b'\xff':
+            code = f.read(1)
+        if not code:
+            raise ValueError("Truncated JPEG header")
+        if code[0] in _STANDALONE_MARKERS:
+            continue
+        if code in (b'\x00', b'\xd8', b'\xd9'):
+            raise ValueError("Invalid JPEG segment marker")
+        
+        marker = b'\xff' + code
+        if code == b'\xda':
+            return header + marker
+        
+        length = f.read(2)
+        if len(length) != 2:
+            raise ValueError("Truncated JPEG header")
+        size = struct.unpack('>H', length)[0] - 2
+        if size < 0:
+            raise ValueError("Invalid JPEG segment length")
+        data = f.read(size)
+        if len(data) != size:
+            raise ValueError("Truncated JPEG header")
+        header += marker + length + data
 
 
 class MetadataHandler:
@@ -19,11 +100,16 @@ class MetadataHandler:
         Args:
             image_path: Path to the image file
         """
-        if not os.path.exists(image_path):
-            raise FileNotFoundError(f"Image file not found: {image_path}")
-        
         self.image_path = image_path
-        self.image = Image.open(image_path)
+        try:
+            self.image = open_image(image_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Image file not found: {image_path}") from None
+    
+    @cached_property
+    def _exif(self) -> Image.Exif:
+        """EXIF data of the image, parsed once per handler."""
+        return self.image.getexif()
     
     def read_metadata(self) -> Dict:
         """
@@ -32,14 +118,9 @@ class MetadataHandler:
         Returns:
             Dictionary of metadata tags
         """
-        metadata = {}
-        
         # Read EXIF data
-        exifdata = self.image.getexif()
-        if exifdata:
-            for tag_id, value in exifdata.items():
-                tag = TAGS.get(tag_id, tag_id)
-                metadata[tag] = value
+        tags_get = TAGS.get
+        metadata = {tags_get(tag_id, tag_id): value for tag_id, value in self._exif.items()}
         
         # Read other metadata
         metadata['format'] = self.image.format
@@ -55,21 +136,18 @@ class MetadataHandler:
         Returns:
             Comment string or None if not found
         """
-        exifdata = self.image.getexif()
+        exifdata = self._exif
         
         # Try different comment tags
-        comment_tags = [270, 37510, 40092]  # ImageDescription, UserComment, etc.
-        
-        for tag_id in comment_tags:
-            if tag_id in exifdata:
-                comment = exifdata[tag_id]
-                if isinstance(comment, (str, bytes)):
-                    if isinstance(comment, bytes):
-                        try:
-                            comment = comment.decode('utf-8')
-                        except UnicodeDecodeError:
-                            continue
-                    return comment
+        for tag_id in _COMMENT_TAGS:
+            comment = exifdata.get(tag_id)
+            if isinstance(comment, str):
+                return comment
+            if isinstance(comment, bytes):
+                try:
+                    return comment.decode('utf-8')
+                except UnicodeDecodeError:
+                    continue
         
         return None
     
@@ -88,25 +166,58 @@ class MetadataHandler:
             # Create output directory if it doesn't exist
             os.makedirs(os.path.dirname(output_path) if os.path.dirname(output_path) else '.', exist_ok=True)
             
-            # Copy image
-            output_image = self.image.copy()
-            
-            # Get existing EXIF data or create new
-            exifdata = output_image.getexif()
+            # Reuse the parsed EXIF data; later reads see the new comment
+            exifdata = self._exif
             
             # Write comment to ImageDescription tag (tag 270)
             exifdata[270] = comment
             
+            output_format = _EXTENSION_FORMATS.get(os.path.splitext(output_path)[1].lower())
+            if self.image.format == 'JPEG' and output_format == 'JPEG':
+                # Splice the new EXIF segment into the original JPEG bytes
+                # instead of decoding and re-encoding the pixels
+                try:
+                    self._splice_exif(exifdata.tobytes(), output_path)
+                    return True
+                except (ValueError, piexif.InvalidImageDataError, struct.error):
+                    # Headers the splice cannot parse (e.g. padding between
+                    # segments) are re-encoded by PIL, which tolerates them
+                    pass
+            
             # Save image with EXIF data
-            output_image.save(output_path, exif=exifdata)
+            self.image.save(output_path, exif=exifdata)
             
             return True
         except Exception as e:
             print(f"Error writing metadata: {e}")
             return False
     
+    def _splice_exif(self, exif_bytes: bytes, output_path: str):
+        """Copy the JPEG to output_path with its EXIF segment replaced."""
+        with open(self.image_path, 'rb') as src:
+            # Only the header segments are rewritten; the compressed scan
+            # data is streamed across unchanged
+            header = io.BytesIO()
+            piexif.insert(exif_bytes, _read_jpeg_header(src), header)
+            scan = src
+            if os.path.abspath(output_path) == os.path.abspath(self.image_path):
+                # Opening the output truncates the source, so buffer the rest first
+                scan = io.BytesIO(src.read())
+            with open(output_path, 'wb') as dst:
+                dst.write(header.getvalue())
+                shutil.copyfileobj(scan, dst)
+    
     def close(self):
         """Close the image file."""
         if self.image:
             self.image.close()
+        self.__dict__.pop('_exif', None)
+    
+    def __enter__(self) -> 'MetadataHandler':
+        """Use the handler as a context manager that closes the image on exit."""
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the image file, even if the block raised."""
+        self.close()
 
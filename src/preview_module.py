@@ -4,55 +4,99 @@ Compares original and modified file properties.
 """
 
 import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from typing import Dict, Optional
 from PIL import Image
 
+from .metadata_handler import open_image
+
+# Formats whose PIL plugins can carry EXIF data
+_EXIF_FORMATS = frozenset({'JPEG', 'MPO', 'PNG', 'TIFF', 'WEBP'})
+
+# img.info keys under which PIL plugins store XMP packets
+_XMP_KEYS = ('xmp', 'XML:com.adobe.xmp')
+
+# Reads the original and modified files concurrently in compare_files
+_executor = ThreadPoolExecutor(max_workers=2)
+
 
 class PreviewModule:
     """Provides preview and comparison of image files."""
     
     @staticmethod
-    def get_file_properties(file_path: str) -> Optional[Dict]:
+    def _get_fast_props(img: Image.Image) -> Dict:
+        """Get the image properties available from the file header alone."""
+        return {
+            'format': img.format,
+            'mode': img.mode,
+            'size': img.size,
+            'width': img.width,
+            'height': img.height,
+        }
+    
+    @staticmethod
+    def _get_exif_count(img: Image.Image) -> int:
+        """Count EXIF tags, skipping the parse for formats without EXIF support."""
+        if img.format not in _EXIF_FORMATS:
+            return 0
+        
+        # The raw EXIF block read at open time starts with a TIFF header; its
+        # first IFD begins with the entry count, so no tag values need decoding.
+        # getexif() may add an orientation tag from XMP, so files with XMP use it.
+        data = img.info.get('exif')
+        if data and not any(key in img.info for key in _XMP_KEYS):
+            if data.startswith(b'Exif\x00\x00'):
+                data = data[6:]
+            try:
+                endian = {b'II': '<', b'MM': '>'}[data[:2]]
+                (offset,) = struct.unpack(endian + 'I', data[4:8])
+                (count,) = struct.unpack(endian + 'H', data[offset:offset + 2])
+                return count
+            except (KeyError, struct.error):
+                pass
+        return len(img.getexif())
+    
+    @staticmethod
+    def _get_stat_props(stat: os.stat_result) -> Dict:
+        """Get the file properties available from os.stat alone."""
+        return {
+            'file_size': stat.st_size,
+            'file_size_mb': round(stat.st_size / (1024 * 1024), 2),
+            'modified_time': datetime.fromtimestamp(stat.st_mtime),
+        }
+    
+    @staticmethod
+    def get_file_properties(file_path: str, stat: Optional[os.stat_result] = None) -> Optional[Dict]:
         """
         Get properties of an image file.
         
         Args:
             file_path: Path to the image file
+            stat: Result of os.stat for file_path, if the caller already has it
             
         Returns:
             Dictionary of file properties or None if file doesn't exist
         """
-        if not os.path.exists(file_path):
-            return None
+        if stat is None:
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
+                return None
         
         try:
-            properties = {}
-            
             # File properties
-            stat = os.stat(file_path)
-            properties['file_size'] = stat.st_size
-            properties['file_size_mb'] = round(stat.st_size / (1024 * 1024), 2)
-            from datetime import datetime
-
-            local_time = datetime.fromtimestamp(stat.st_mtime)
-            properties['modified_time'] = local_time
+            properties = PreviewModule._get_stat_props(stat)
             
             # Image properties
-            with Image.open(file_path) as img:
-                properties['format'] = img.format
-                properties['mode'] = img.mode
-                properties['size'] = img.size
-                properties['width'] = img.width
-                properties['height'] = img.height
+            with open_image(file_path) as img:
+                properties.update(PreviewModule._get_fast_props(img))
                 
                 # Metadata
-                exifdata = img.getexif()
-                if exifdata:
-                    properties['has_exif'] = True
-                    properties['exif_tags_count'] = len(exifdata)
-                else:
-                    properties['has_exif'] = False
-                    properties['exif_tags_count'] = 0
+                exif_tags_count = PreviewModule._get_exif_count(img)
+                properties['has_exif'] = exif_tags_count > 0
+                properties['exif_tags_count'] = exif_tags_count
             
             return properties
         except Exception as e:
@@ -70,8 +114,28 @@ class PreviewModule:
         Returns:
             Dictionary with comparison results
         """
-        original_props = PreviewModule.get_file_properties(original_path)
-        modified_props = PreviewModule.get_file_properties(modified_path)
+        # Files with the same size and modification time are treated as
+        # unchanged, so neither image needs to be opened
+        try:
+            original_stat = os.stat(original_path)
+            modified_stat = os.stat(modified_path)
+        except OSError:
+            original_stat = modified_stat = None
+        else:
+            if (original_stat.st_size == modified_stat.st_size
+                    and original_stat.st_mtime_ns == modified_stat.st_mtime_ns):
+                return {
+                    'original': PreviewModule._get_stat_props(original_stat),
+                    'modified': PreviewModule._get_stat_props(modified_stat),
+                    'differences': {}
+                }
+        
+        # Reuse the stat results so each file is only stat'ed once
+        original_future = _executor.submit(
+            PreviewModule.get_file_properties, original_path, original_stat
+        )
+        modified_props = PreviewModule.get_file_properties(modified_path, modified_stat)
+        original_props = original_future.result()
         
         comparison = {
             'original': original_props,